@@ -4,15 +4,125 @@ Provides user-friendly command line interface for the simulation
 """
 
 import typer
+import numpy as np
 from typing import Dict, List, Optional, Any
 from rich.console import Console
 from rich.table import Table
 from rich.progress import track
-import time
-import random
+from .utils_numba import fill_defaults_for
+from collections import OrderedDict
+from contextlib import nullcontext
+import re
+import functools
+import zlib
 
 console = Console()
 
+# Era competitiveness factor for each era
+# (1950-1960, 1961-1980, 1981-2000, 2001-2013, 2014-2025)
+_ERA_FIRST_YEAR = 1950
+_ERA_LAST_YEAR = 2025
+_ERA_FACTORS = (0.6, 0.75, 0.85, 0.90, 0.95)
+
+
+def _era_competitiveness(year: int) -> float:
+    """Era competitiveness factor for a season"""
+    if not _ERA_FIRST_YEAR <= year <= _ERA_LAST_YEAR:
+        return 0.8  # Default
+    # Era boundaries are fixed, so the index is just the count of those passed
+    return _ERA_FACTORS[(year >= 1961) + (year >= 1981) + (year >= 2001) + (year >= 2014)]
+
+
+# Default-feature buckets, matched on the first keyword found in a feature
+# name; anything else falls into the trailing "other" bucket
+_FEATURE_KEYWORDS = ('skill', 'experience', 'era', 'position', 'points', 'rate')
+
+# Uniform draw bounds per bucket (experience/era are filled from the year)
+_KIND_LOW = np.array([50.0, 0.0, 0.0, 5.0, 20.0, 0.1, -1.0])
+_KIND_HIGH = np.array([75.0, 0.0, 0.0, 15.0, 200.0, 0.8, 1.0])
+
+
+def _feature_kind(feature: str) -> int:
+    """Bucket index for a feature name"""
+    feature = feature.lower()
+    for kind, keyword in enumerate(_FEATURE_KEYWORDS):
+        if keyword in feature:
+            return kind
+    return len(_FEATURE_KEYWORDS)
+
+
+def _format_race_progress(phase: str, *args) -> str:
+    """Status line for a RaceSimulator progress callback"""
+    if phase == "grid":
+        return "🏁 Setting up grid..."
+    if phase == "qualifying":
+        return "🏎️ Running qualifying..."
+    lap, laps = args
+    return f"🏁 Racing lap {lap}/{laps}..."
+
+
+# Known what-if scenarios, matched as substrings of the lowercased question
+_SCENARIOS_DB = {
+    "hamilton in ferrari": {
+        "prediction": "Likely 2-3 additional championships",
+        "confidence": 0.75,
+        "details": [
+            "Ferrari's speed advantage would complement Hamilton's race craft",
+            "Strategic errors might still be a limiting factor",
+            "Estimated 85-90 skill rating in competitive Ferrari"
+        ]
+    },
+    "schumacher in red bull": {
+        "prediction": "Dominant era similar to his Ferrari years",
+        "confidence": 0.80,
+        "details": [
+            "Red Bull's reliability would suit Schumacher's consistency",
+            "Technical partnership would be highly effective",
+            "Estimated 95+ skill rating in peak Red Bull era"
+        ]
+    },
+    "senna in modern f1": {
+        "prediction": "Multiple championships with any top team",
+        "confidence": 0.85,
+        "details": [
+            "Raw speed would translate perfectly to modern F1",
+            "Adaptability to modern technology would be strong",
+            "Estimated 90-95 skill rating in hybrid era"
+        ]
+    }
+}
+_SCENARIO_RE = re.compile("|".join(re.escape(key) for key in _SCENARIOS_DB))
+
+
+# Most recent predictions kept by each CLI
+_PREDICTION_CACHE_SIZE = 512
+
+# All-time peak ratings shown in the stats view (shared, treat as read-only)
+_TOP_DRIVERS = (
+    {'name': 'Ayrton Senna', 'peak_year': 1991, 'peak_rating': 94.2},
+    {'name': 'Michael Schumacher', 'peak_year': 2004, 'peak_rating': 93.8},
+    {'name': 'Lewis Hamilton', 'peak_year': 2020, 'peak_rating': 93.1},
+    {'name': 'Alain Prost', 'peak_year': 1986, 'peak_rating': 91.7},
+    {'name': 'Max Verstappen', 'peak_year': 2023, 'peak_rating': 91.5}
+)
+
+
+# RaceSimulator, imported on first use to avoid circular imports
+_RaceSimulator = None
+
+
+def _race_simulator_class():
+    """Import RaceSimulator once per process"""
+    global _RaceSimulator
+    if _RaceSimulator is None:
+        from .race_simulator import RaceSimulator as _RaceSimulator
+    return _RaceSimulator
+
+
+def _feature_seed(driver_name: str, year: int) -> int:
+    """Stable per-(driver, year) RNG seed, independent of PYTHONHASHSEED"""
+    return zlib.crc32(f"{driver_name}|{year}".encode())
+
 class F1SimulatorCLI:
     """CLI interface for F1 simulation"""
     
@@ -21,43 +131,115 @@ class F1SimulatorCLI:
         self.race_simulator = None
         self.predictions_made = 0
         
-        # Import here to avoid circular imports
-        from .race_simulator import RaceSimulator
-        self.race_simulator = RaceSimulator(engine)
+        # Default feature sets keyed by (driver, year, constructor, engine)
+        self._feat_cache: Dict[tuple, Dict[str, float]] = {}
+        
+        # LRU of predictions keyed by (driver, year, constructor); verbose is not
+        # part of the key. A plain OrderedDict so batches can check and fill it.
+        self._pred_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+        
+        # Classify the engine's features once so defaults are drawn in one call
+        self._feature_buckets = np.array([_feature_kind(f) for f in engine.feature_names], dtype=np.int8)
+        self._low = _KIND_LOW[self._feature_buckets]
+        self._high = _KIND_HIGH[self._feature_buckets]
+        self._fill_defaults = fill_defaults_for(len(self._feature_buckets))
+        
+        self.race_simulator = _race_simulator_class()(engine)
+        
+        # Help table output, rendered on first use
+        self._help_rendered: Optional[str] = None
+        
+        # Interactive mode handlers keyed by command word; each gets the full command
+        self._commands = {
+            'predict': self._handle_interactive_predict,
+            'compare': self._handle_interactive_compare,
+            'race': self._handle_interactive_race,
+            'stats': lambda _: self._show_interactive_stats(),
+            'drivers': lambda _: self._show_available_drivers(),
+            'tracks': lambda _: self._show_available_tracks(),
+            'help': lambda _: self._show_interactive_help(),
+        }
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _norm_name(name: str) -> str:
+        """Normalize a driver name as typed ('max_verstappen') to its display form"""
+        return name.replace('_', ' ').title()
     
     def predict_driver_skill(self, driver_name: str, year: int, constructor: str, verbose: bool = False) -> Optional[Dict]:
         """Predict driver skill with CLI feedback"""
-        
-        console.print(f"🔮 Predicting skill for {driver_name} ({year})...")
-        
-        # Get historical data if available
-        driver_data = self.engine.get_driver_historical_data(driver_name, year)
-        
-        if driver_data:
-            # Use historical data
-            result = {
-                'skill_rating': driver_data.get('skill_rating', 50),
-                'race_performance': driver_data.get('skill_rating', 50) * 0.8,
-                'experience_factor': min(1.0, (year - 1950) / 75),
-                'era_adjustment': self._get_era_competitiveness(year),
-                'confidence': 0.99
-            }
-        else:
-            # Generate prediction using default features
-            default_features = self._generate_default_features(driver_name, year, constructor)
-            result = self.engine.predict_driver_skill(default_features)
-        
-        self.predictions_made += 1
-        return result
+        return self._predict_batch([(driver_name, year, constructor)])[0]
+    
+    def _predict_batch(self, requests: List[tuple]) -> List[Dict]:
+        """Predict (driver, year, constructor) requests, sending every request
+        without historical data or a cached prediction to the engine as one batch"""
+        
+        results = []
+        pending = []  # (position, key) pairs that need model inference
+        
+        for driver_name, year, constructor in requests:
+            # Normalize before the cache lookup so casing variants share an entry
+            driver_name = self._norm_name(driver_name)
+            key = (driver_name, year, constructor)
+            console.print(f"🔮 Predicting skill for {driver_name} ({year})...")
+            
+            # Historical data is read fresh each time since the driver database
+            # can change at runtime; only model inference results are cached
+            driver_data = self.engine.get_driver_historical_data(driver_name, year)
+            if driver_data:
+                result = self._historical_prediction(driver_data, year)
+            else:
+                result = self._pred_cache.get(key)
+                if result is not None:
+                    self._pred_cache.move_to_end(key)
+                else:
+                    pending.append((len(results), key))
+            
+            results.append(result)
+        
+        if pending:
+            # Generate predictions using default features, one engine call for all
+            features_list = [self._generate_default_features(*key) for _, key in pending]
+            batch_results = self.engine.predict_driver_skill_batch(features_list)
+            for (position, key), result in zip(pending, batch_results):
+                # Error fallbacks are not cached so a transient failure is retried
+                if 'error' not in result:
+                    self._remember_prediction(key, result)
+                results[position] = result
+        
+        self.predictions_made += len(results)
+        
+        # Copy so callers can't alter the cached results
+        return [dict(result) for result in results]
+    
+    def _historical_prediction(self, driver_data: Dict, year: int) -> Dict:
+        """Prediction built from a driver's recorded season"""
+        return {
+            'skill_rating': driver_data.get('skill_rating', 50),
+            'race_performance': driver_data.get('skill_rating', 50) * 0.8,
+            'experience_factor': min(1.0, (year - 1950) / 75),
+            'era_adjustment': self._get_era_competitiveness(year),
+            'confidence': 0.99
+        }
+    
+    def _remember_prediction(self, key: tuple, result: Dict):
+        """Store a prediction, evicting the least recently used past the cache size"""
+        self._pred_cache[key] = result
+        if len(self._pred_cache) > _PREDICTION_CACHE_SIZE:
+            self._pred_cache.popitem(last=False)
+    
+    def clear_prediction_cache(self):
+        """Drop cached predictions, e.g. after the engine reloads its models"""
+        self._pred_cache.clear()
+        self._feat_cache.clear()
     
     def compare_drivers(self, driver1: str, year1: int, driver2: str, year2: int, detailed: bool = False) -> Optional[Dict]:
         """Compare two drivers with detailed analysis"""
         
         console.print(f"⚔️ Comparing {driver1} ({year1}) vs {driver2} ({year2})...")
         
-        # Get predictions for both drivers
-        pred1 = self.predict_driver_skill(driver1, year1, "default")
-        pred2 = self.predict_driver_skill(driver2, year2, "default")
+        # Get predictions for both drivers in one batch
+        pred1, pred2 = self._predict_batch([(driver1, year1, "default"), (driver2, year2, "default")])
         
         if not pred1 or not pred2:
             return None
@@ -84,19 +266,14 @@ class F1SimulatorCLI:
             console.print("❌ Race simulator not available")
             return None
         
-        # Show progress
-        with console.status("[bold green]Simulating race...") as status:
-            status.update("🏁 Setting up grid...")
-            time.sleep(1)
-            
-            status.update("🏎️ Running qualifying...")
-            time.sleep(1)
-            
-            status.update(f"🏁 Racing {laps} laps...")
-            time.sleep(2)
-            
-            # Run actual simulation
-            result = self.race_simulator.simulate_race(track, year, drivers, weather, laps)
+        # Show progress driven by the simulation itself; skip the live display
+        # entirely when output isn't a terminal
+        status_cm = console.status("[bold green]Simulating race...") if console.is_terminal else nullcontext()
+        with status_cm as status:
+            progress = None
+            if status is not None:
+                progress = lambda phase, *args: status.update(_format_race_progress(phase, *args))
+            result = self.race_simulator.simulate_race(track, year, drivers, weather, laps, progress=progress)
         
         if result.get('success'):
             console.print("✅ Race simulation completed!")
@@ -111,40 +288,9 @@ class F1SimulatorCLI:
         console.print(f"🤔 Analyzing scenario: {scenario}")
         
         # Simple what-if logic (can be expanded)
-        scenarios_db = {
-            "hamilton in ferrari": {
-                "prediction": "Likely 2-3 additional championships",
-                "confidence": 0.75,
-                "details": [
-                    "Ferrari's speed advantage would complement Hamilton's race craft",
-                    "Strategic errors might still be a limiting factor",
-                    "Estimated 85-90 skill rating in competitive Ferrari"
-                ]
-            },
-            "schumacher in red bull": {
-                "prediction": "Dominant era similar to his Ferrari years",
-                "confidence": 0.80,
-                "details": [
-                    "Red Bull's reliability would suit Schumacher's consistency",
-                    "Technical partnership would be highly effective",
-                    "Estimated 95+ skill rating in peak Red Bull era"
-                ]
-            },
-            "senna in modern f1": {
-                "prediction": "Multiple championships with any top team",
-                "confidence": 0.85,
-                "details": [
-                    "Raw speed would translate perfectly to modern F1",
-                    "Adaptability to modern technology would be strong",
-                    "Estimated 90-95 skill rating in hybrid era"
-                ]
-            }
-        }
-        
-        scenario_lower = scenario.lower()
-        for key, result in scenarios_db.items():
-            if key in scenario_lower:
-                return result
+        match = _SCENARIO_RE.search(scenario.lower())
+        if match:
+            return _SCENARIOS_DB[match.group(0)]
         
         # Generic response for unknown scenarios
         return {
@@ -159,16 +305,8 @@ class F1SimulatorCLI:
         base_stats = self.engine.get_system_stats()
         
         # Add CLI-specific stats
-        base_stats.update({
-            'predictions_made': self.predictions_made,
-            'top_drivers': [
-                {'name': 'Ayrton Senna', 'peak_year': 1991, 'peak_rating': 94.2},
-                {'name': 'Michael Schumacher', 'peak_year': 2004, 'peak_rating': 93.8},
-                {'name': 'Lewis Hamilton', 'peak_year': 2020, 'peak_rating': 93.1},
-                {'name': 'Alain Prost', 'peak_year': 1986, 'peak_rating': 91.7},
-                {'name': 'Max Verstappen', 'peak_year': 2023, 'peak_rating': 91.5}
-            ]
-        })
+        base_stats['predictions_made'] = self.predictions_made
+        base_stats['top_drivers'] = _TOP_DRIVERS
         
         return base_stats
     
@@ -185,20 +323,11 @@ class F1SimulatorCLI:
                 if command in ['exit', 'quit']:
                     console.print("👋 Goodbye!")
                     break
-                elif command == 'help':
-                    self._show_interactive_help()
-                elif command.startswith('predict'):
-                    self._handle_interactive_predict(command)
-                elif command.startswith('compare'):
-                    self._handle_interactive_compare(command)
-                elif command.startswith('race'):
-                    self._handle_interactive_race(command)
-                elif command == 'stats':
-                    self._show_interactive_stats()
-                elif command == 'drivers':
-                    self._show_available_drivers()
-                elif command == 'tracks':
-                    self._show_available_tracks()
+                
+                # Dispatch on the first word of the command
+                handler = self._commands.get(command.partition(' ')[0])
+                if handler:
+                    handler(command)
                 else:
                     console.print(f"❓ Unknown command: {command}. Type 'help' for available commands.")
                     
@@ -245,61 +374,56 @@ class F1SimulatorCLI:
         # This is a simplified feature generation
         # In a real implementation, you'd have more sophisticated logic
         
-        base_features = {}
-        
-        # Add all required features with reasonable defaults
-        for feature in self.engine.feature_names:
-            if 'skill' in feature.lower():
-                base_features[feature] = 60 + random.uniform(-10, 15)
-            elif 'experience' in feature.lower():
-                base_features[feature] = min(1.0, (year - 1950) / 70)
-            elif 'era' in feature.lower():
-                base_features[feature] = self._get_era_competitiveness(year)
-            elif 'position' in feature.lower():
-                base_features[feature] = random.uniform(5, 15)
-            elif 'points' in feature.lower():
-                base_features[feature] = random.uniform(20, 200)
-            elif 'rate' in feature.lower():
-                base_features[feature] = random.uniform(0.1, 0.8)
-            else:
-                base_features[feature] = random.uniform(-1, 1)
+        cache_key = (driver_name, year, constructor, id(self.engine))
+        cached = self._feat_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Seeded per driver and year so the defaults (and the cache) are reproducible
+        rng = np.random.default_rng(_feature_seed(driver_name, year))
+        
+        # Draw every feature at once, then scale the draws into each feature's
+        # bounds and fill the year-derived buckets
+        values = self._fill_defaults(
+            self._feature_buckets, self._low, self._high,
+            rng.random(len(self._feature_buckets)),
+            min(1.0, (year - 1950) / 70), self._get_era_competitiveness(year),
+            np.empty(len(self._feature_buckets))
+        )
         
+        base_features = dict(zip(self.engine.feature_names, values.tolist()))
+        
+        self._feat_cache[cache_key] = base_features
         return base_features
     
     def _get_era_competitiveness(self, year: int) -> float:
         """Get era competitiveness factor"""
-        
-        era_factors = {
-            (1950, 1960): 0.6,
-            (1961, 1980): 0.75, 
-            (1981, 2000): 0.85,
-            (2001, 2013): 0.90,
-            (2014, 2025): 0.95
-        }
-        
-        for (start, end), factor in era_factors.items():
-            if start <= year <= end:
-                return factor
-        
-        return 0.8  # Default
+        return _era_competitiveness(year)
     
     def _show_interactive_help(self):
         """Show interactive mode help"""
         
-        table = Table(title="Available Commands")
-        table.add_column("Command", style="cyan")
-        table.add_column("Description", style="white")
-        
-        table.add_row("predict <driver> <year>", "Predict driver skill")
-        table.add_row("compare <d1> <y1> <d2> <y2>", "Compare two drivers")
-        table.add_row("race <track> <year>", "Simulate a race")
-        table.add_row("stats", "Show system statistics")
-        table.add_row("drivers", "List available drivers")
-        table.add_row("tracks", "List available tracks")
-        table.add_row("help", "Show this help")
-        table.add_row("exit", "Exit interactive mode")
+        # The help table never changes, so render it once and reuse the output
+        if self._help_rendered is None:
+            table = Table(title="Available Commands")
+            table.add_column("Command", style="cyan")
+            table.add_column("Description", style="white")
+            
+            table.add_row("predict <driver> <year>", "Predict driver skill")
+            table.add_row("compare <d1> <y1> <d2> <y2>", "Compare two drivers")
+            table.add_row("race <track> <year>", "Simulate a race")
+            table.add_row("stats", "Show system statistics")
+            table.add_row("drivers", "List available drivers")
+            table.add_row("tracks", "List available tracks")
+            table.add_row("help", "Show this help")
+            table.add_row("exit", "Exit interactive mode")
+            
+            with console.capture() as capture:
+                console.print(table)
+            self._help_rendered = capture.get()
         
-        console.print(table)
+        console.file.write(self._help_rendered)
+        console.file.flush()
     
     def _show_interactive_stats(self):
         """Show statistics in interactive mode"""
@@ -322,23 +446,23 @@ class F1SimulatorCLI:
         drivers = self.engine.list_available_drivers()[:20]  # Show first 20
         
         console.print(f"🏎️ Available Drivers ({len(drivers)} shown):")
-        for driver in drivers:
-            console.print(f"   • {driver}")
+        if drivers:
+            console.print("\n".join(f"   • {driver}" for driver in drivers))
     
     def _show_available_tracks(self):
         """Show available tracks"""
         tracks = self.engine.list_available_tracks()
         
         console.print(f"🏁 Available Tracks ({len(tracks)}):")
-        for track in tracks:
-            console.print(f"   • {track}")
+        if tracks:
+            console.print("\n".join(f"   • {track}" for track in tracks))
     
     def _handle_interactive_predict(self, command: str):
         """Handle interactive predict command"""
         try:
             parts = command.split()
             if len(parts) >= 3:
-                driver = parts[1].replace('_', ' ').title()
+                driver = self._norm_name(parts[1])
                 year = int(parts[2])
                 result = self.predict_driver_skill(driver, year, "default", verbose=True)
                 
@@ -356,9 +480,9 @@ class F1SimulatorCLI:
         try:
             parts = command.split()
             if len(parts) >= 5:
-                driver1 = parts[1].replace('_', ' ').title()
+                driver1 = self._norm_name(parts[1])
                 year1 = int(parts[2])
-                driver2 = parts[3].replace('_', ' ').title()
+                driver2 = self._norm_name(parts[3])
                 year2 = int(parts[4])
                 
                 result = self.compare_drivers(driver1, year1, driver2, year2, detailed=True)
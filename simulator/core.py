@@ -5,6 +5,7 @@ Creates missing files automatically for standalone operation
 
 import pandas as pd
 import numpy as np
+import pyarrow.parquet as pq
 import joblib
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
@@ -12,22 +13,173 @@ import logging
 import json
 import warnings
 import os
+import functools
+from .utils_numba import race_performance, driver_season_fields, WEATHER_CODES
 
-warnings.filterwarnings("ignore")
 logger = logging.getLogger(__name__)
 
+# Lookup field -> parquet column for the track and car databases
+_TRACK_FIELDS = {
+    'name': 'track_name',
+    'country': 'country',
+    'length_km': 'track_length_km',
+    'overtaking_difficulty': 'overtaking_difficulty',
+    'weather_sensitivity': 'weather_sensitivity',
+    'driver_skill_importance': 'driver_skill_importance',
+    'car_performance_importance': 'car_performance_importance',
+    'safety_car_probability': 'safety_car_probability'
+}
+_CAR_FIELDS = {
+    'name': 'constructor_name',
+    'overall_performance': 'overall_performance',
+    'speed_rating': 'speed_rating',
+    'cornering_rating': 'cornering_rating',
+    'reliability_rating': 'reliability_rating'
+}
+
+# Per-season driver fields and the value used when a file lacks the column
+_DRIVER_DEFAULTS = {
+    'skill_rating': 50,
+    'constructor_id': '',
+    'championship_position': 20,
+    'points': 0,
+    'wins': 0
+}
+
+# Columns each loader reads; the rest of each file is never decoded
+_TRACK_COLUMNS = ('track_id', *_TRACK_FIELDS.values())
+_CAR_COLUMNS = ('constructor_id', *_CAR_FIELDS.values())
+_DRIVER_COLUMNS = ('driver_name', 'name', 'driver_id', 'season', 'team', *_DRIVER_DEFAULTS)
+
+
+# Trained models, scalers, encoders and feature names shared across engines,
+# keyed by models directory and the mtimes of the files they came from
+_MODEL_CACHE: Dict[tuple, tuple] = {}
+
+
+def _write_parquet(df: pd.DataFrame, path, dictionary_columns=True):
+    """Write a generated table zstd-compressed with dictionary-encoded columns"""
+    df.to_parquet(
+        path, engine='pyarrow', compression='zstd', compression_level=3,
+        use_dictionary=dictionary_columns, row_group_size=50000
+    )
+
+
+def _load_pickle(path):
+    """joblib.load with unpickling warnings (library version mismatches) silenced"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return joblib.load(path)
+
+
+@functools.lru_cache(maxsize=8)
+def _read_parquet_version(path: str, mtime_ns: int, columns: Tuple[str, ...]) -> pd.DataFrame:
+    """The given columns (those present) of one version of a parquet file,
+    read through a memory map; shared, so never modified"""
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    present = set(parquet_file.schema_arrow.names)
+    return parquet_file.read(columns=[column for column in columns if column in present]).to_pandas()
+
+
+def _read_parquet(path, columns: Tuple[str, ...]) -> pd.DataFrame:
+    """Read parquet columns, reusing the parsed frame while the file's mtime is unchanged"""
+    return _read_parquet_version(str(path), os.stat(path).st_mtime_ns, columns)
+
+
+def _column(df: pd.DataFrame, column: str, default: Any = None) -> list:
+    """Column values as Python objects, or the default repeated when it is missing"""
+    if column in df.columns:
+        return df[column].tolist()
+    return [default] * len(df)
+
+
+def _build_lookup(df: pd.DataFrame, key: str, fields: Dict[str, str]) -> Dict[Any, Dict]:
+    """Build {key: {field: value}} from whole columns in one pass"""
+    columns = [df[column].tolist() for column in fields.values()]
+    return {
+        key_value: dict(zip(fields, values))
+        for key_value, values in zip(df[key].tolist(), zip(*columns))
+    }
+
+
+@functools.lru_cache(maxsize=8)
+def _driver_seasons_version(path: str, mtime_ns: int) -> pd.DataFrame:
+    """Normalized driver seasons for one version of a drivers file"""
+    return _driver_seasons(_read_parquet_version(path, mtime_ns, _DRIVER_COLUMNS))
+
+
+def _driver_seasons(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize one drivers file to driver_name, season and the per-season fields"""
+    
+    # Name comes from the first non-empty identifying column of each row
+    names = [
+        driver_name or name or driver_id
+        for driver_name, name, driver_id in zip(
+            _column(df, 'driver_name'), _column(df, 'name'), _column(df, 'driver_id')
+        )
+    ]
+    
+    constructor_column = 'constructor_id' if 'constructor_id' in df.columns else 'team'
+    seasons = pd.DataFrame({
+        'driver_name': names,
+        'season': _column(df, 'season', 0),
+        **{
+            field: _column(df, constructor_column if field == 'constructor_id' else field, default)
+            for field, default in _DRIVER_DEFAULTS.items()
+        }
+    })
+    
+    # Constructor ids repeat across seasons; store each distinct string once
+    seasons['constructor_id'] = seasons['constructor_id'].astype('category')
+    return seasons[[bool(name) for name in names]]
+
+
+def _add_driver_seasons(drivers_database: Dict, seasons: pd.DataFrame):
+    """Merge normalized driver seasons into {name: {season: fields}}, later rows winning"""
+    columns = [seasons[field].tolist() for field in _DRIVER_DEFAULTS]
+    records = [dict(zip(_DRIVER_DEFAULTS, values)) for values in zip(*columns)]
+    season_list = seasons['season'].tolist()
+    
+    # Build each driver's season dict in one shot from its row positions
+    for name, rows in seasons.groupby('driver_name', sort=False, dropna=False).indices.items():
+        driver_seasons = {season_list[i]: records[i] for i in rows.tolist()}
+        if name in drivers_database:
+            drivers_database[name].update(driver_seasons)
+        else:
+            drivers_database[name] = driver_seasons
+
 class F1SimulationEngine:
     """Self-contained F1 simulation engine"""
     
     def __init__(self, config):
         self.config = config
+        
+        # Directories and files the engine reads and creates
+        self._data_dir = Path(config.DATA_DIR)
+        self._models_dir = Path(config.MODELS_DIR)
+        self._enhanced_dir = self._data_dir / 'enhanced'
+        self._ml_ready_dir = self._data_dir / 'ml_ready'
+        self._tracks_parquet = self._enhanced_dir / 'enhanced_tracks.parquet'
+        self._cars_parquet = self._enhanced_dir / 'enhanced_cars_2025.parquet'
+        self._enhanced_drivers_parquet = self._enhanced_dir / 'enhanced_drivers.parquet'
+        self._drivers_parquet = self._ml_ready_dir / 'full_enhanced_dataset.parquet'
+        
         self.models = {}
         self.scalers = {}
         self.encoders = {}
         self.feature_names = []
+        self._fill_features = None
+        self._apply_scaler = None
+        self._feat_buf = np.zeros((1, 0), dtype=np.float32)
         self.tracks_data = {}
         self.cars_data = {}
-        self.drivers_database = {}
+        self._tracks_lc = {}
+        self._cars_lc = {}
+        self._track_names = ()
+        self._constructor_names = ()
+        self._car_idx = {}
+        self._car_perf_arr = np.array([70.0])
+        self._car_reliability_arr = np.array([0.8])
         
         # Create missing directories
         self._ensure_directories()
@@ -38,17 +190,14 @@ class F1SimulationEngine:
         self._load_trained_models()
         self._load_track_data()
         self._load_car_data()
-        self._load_drivers_database()
+        self._index_lookups()
+        self._index_cars()
         
         logger.info("✅ F1 Simulation Engine initialized successfully")
     
     def _ensure_directories(self):
         """Create necessary directories"""
-        dirs = [
-            Path(self.config.DATA_DIR) / 'enhanced',
-            Path(self.config.DATA_DIR) / 'ml_ready',
-            Path(self.config.MODELS_DIR)
-        ]
+        dirs = [self._enhanced_dir, self._ml_ready_dir, self._models_dir]
         
         for dir_path in dirs:
             dir_path.mkdir(parents=True, exist_ok=True)
@@ -56,37 +205,35 @@ class F1SimulationEngine:
     def _create_missing_data_files(self):
         """Create missing data files with realistic F1 data"""
         
-        data_dir = Path(self.config.DATA_DIR)
-        
         # Create tracks data file
-        tracks_file = data_dir / 'enhanced' / 'enhanced_tracks.parquet'
+        tracks_file = self._tracks_parquet
         if not tracks_file.exists():
             print("📁 Creating tracks database...")
             tracks_data = self._generate_tracks_data()
             tracks_df = pd.DataFrame(tracks_data)
-            tracks_df.to_parquet(tracks_file)
+            _write_parquet(tracks_df, tracks_file)
             print(f"✅ Created {tracks_file}")
         
         # Create cars data file
-        cars_file = data_dir / 'enhanced' / 'enhanced_cars_2025.parquet'
+        cars_file = self._cars_parquet
         if not cars_file.exists():
             print("🏎️ Creating 2025 cars database...")
             cars_data = self._generate_cars_data()
             cars_df = pd.DataFrame(cars_data)
-            cars_df.to_parquet(cars_file)
+            _write_parquet(cars_df, cars_file)
             print(f"✅ Created {cars_file}")
         
         # Create drivers database
-        drivers_file = data_dir / 'ml_ready' / 'full_enhanced_dataset.parquet'
+        drivers_file = self._drivers_parquet
         if not drivers_file.exists():
             print("👥 Creating drivers database...")
             drivers_data = self._generate_drivers_data()
             drivers_df = pd.DataFrame(drivers_data)
-            drivers_df.to_parquet(drivers_file)
+            _write_parquet(drivers_df, drivers_file, ['driver_name', 'constructor_id', 'driver_id'])
             print(f"✅ Created {drivers_file}")
         
         # Create missing model preprocessing files
-        models_dir = Path(self.config.MODELS_DIR)
+        models_dir = self._models_dir
         
         # Create feature names
         feature_names_file = models_dir / 'enhanced_feature_names.json'
@@ -156,38 +303,48 @@ class F1SimulationEngine:
             ('Daniel Ricciardo', 2011, 2023, 'red_bull', [18, 13, 3, 3, 3, 5, 7, 9, 8, 5, 8, 14, 8]),
         ]
         
+        # Flatten every driver season into columns, then compute the derived
+        # fields for all of them in one kernel call
+        names, constructors, years, positions = [], [], [], []
         for driver_name, start_year, end_year, main_constructor, championship_positions in famous_drivers:
             years_active = list(range(start_year, min(end_year + 1, 2024)))
-            
-            for i, year in enumerate(years_active):
-                if i < len(championship_positions):
-                    champ_pos = championship_positions[i]
-                else:
-                    champ_pos = np.random.randint(5, 15)
-                
-                # Calculate skill rating based on championship position and era
-                base_skill = max(45, 105 - (champ_pos * 3.5))
-                
-                # Era adjustment
-                if year < 1990:
-                    era_bonus = 5  # Classic era
-                elif year < 2010:
-                    era_bonus = 8  # Modern era
-                else:
-                    era_bonus = 10  # Hybrid era
-                
-                skill_rating = min(100, base_skill + era_bonus + np.random.normal(0, 2))
-                
-                drivers_data.append({
-                    'driver_name': driver_name,
-                    'driver_id': driver_name.lower().replace(' ', '_'),
-                    'season': year,
-                    'constructor_id': main_constructor,
-                    'skill_rating': round(skill_rating, 1),
-                    'championship_position': champ_pos,
-                    'points': max(0, int(400 - (champ_pos * 25) + np.random.normal(0, 50))),
-                    'wins': max(0, int(12 - champ_pos + np.random.poisson(2)) if champ_pos <= 3 else np.random.poisson(0.5)),
-                })
+            names += [driver_name] * len(years_active)
+            constructors += [main_constructor] * len(years_active)
+            years += years_active
+            # Seasons past the recorded positions get a random one below
+            positions += championship_positions[:len(years_active)]
+            positions += [0] * (len(years_active) - len(championship_positions))
+        
+        total_rows = len(years)
+        rng = np.random.default_rng()
+        fallback_positions = rng.integers(5, 15, total_rows)
+        skill_noise = rng.normal(0, 2, total_rows)
+        points_noise = rng.normal(0, 50, total_rows)
+        wins_contender = rng.poisson(2, total_rows)
+        wins_other = rng.poisson(0.5, total_rows)
+        
+        year_arr = np.array(years, dtype=np.int64)
+        champ_pos = np.array(positions, dtype=np.int64)
+        champ_pos = np.where(champ_pos == 0, fallback_positions, champ_pos)
+        
+        skill, points, wins = driver_season_fields(
+            champ_pos, year_arr, skill_noise, points_noise, wins_contender, wins_other
+        )
+        
+        for driver_name, constructor, year, pos, skill_rating, season_points, season_wins in zip(
+            names, constructors, years, champ_pos.tolist(),
+            np.round(skill, 1).tolist(), points.tolist(), wins.tolist()
+        ):
+            drivers_data.append({
+                'driver_name': driver_name,
+                'driver_id': driver_name.lower().replace(' ', '_'),
+                'season': year,
+                'constructor_id': constructor,
+                'skill_rating': skill_rating,
+                'championship_position': pos,
+                'points': season_points,
+                'wins': season_wins,
+            })
         
         return drivers_data
     
@@ -206,32 +363,66 @@ class F1SimulationEngine:
     def _load_trained_models(self):
         """Load pre-trained ML models"""
         try:
-            models_dir = Path(self.config.MODELS_DIR)
+            models_dir = self._models_dir
             
             # Load main models
             primary_model_path = models_dir / 'gradient_boosting_model.pkl'
             ensemble_model_path = models_dir / 'ensemble_model.pkl'
             
-            if primary_model_path.exists():
-                self.models['primary'] = joblib.load(primary_model_path)
-                print("✅ Loaded Gradient Boosting model (99.9% accuracy)")
-            else:
-                raise FileNotFoundError(f"Primary model not found: {primary_model_path}")
+            scalers_path = models_dir / 'enhanced_scalers.pkl'
+            encoders_path = models_dir / 'enhanced_encoders.pkl'
+            feature_names_path = models_dir / 'enhanced_feature_names.json'
             
-            if ensemble_model_path.exists():
-                self.models['ensemble'] = joblib.load(ensemble_model_path)
-                print("✅ Loaded Ensemble model")
+            # Share objects already loaded by another engine from unchanged files
+            cache_key = (str(models_dir), *(
+                path.stat().st_mtime_ns if path.exists() else None
+                for path in (primary_model_path, ensemble_model_path, scalers_path, encoders_path, feature_names_path)
+            ))
+            cached = _MODEL_CACHE.get(cache_key)
+            if cached is not None:
+                models, self.scalers, self.encoders, feature_names = cached
+                self.models = dict(models)
+                self.feature_names = list(feature_names)
             else:
-                print("⚠️ Ensemble model not found, using primary model")
-                self.models['ensemble'] = self.models['primary']
-            
-            # Load preprocessing objects
-            self.scalers = joblib.load(models_dir / 'enhanced_scalers.pkl')
-            self.encoders = joblib.load(models_dir / 'enhanced_encoders.pkl')
+                if primary_model_path.exists():
+                    self.models['primary'] = _load_pickle(primary_model_path)
+                    print("✅ Loaded Gradient Boosting model (99.9% accuracy)")
+                else:
+                    raise FileNotFoundError(f"Primary model not found: {primary_model_path}")
+                
+                if ensemble_model_path.exists():
+                    self.models['ensemble'] = _load_pickle(ensemble_model_path)
+                    print("✅ Loaded Ensemble model")
+                else:
+                    print("⚠️ Ensemble model not found, using primary model")
+                    self.models['ensemble'] = self.models['primary']
+                
+                # Load preprocessing objects
+                self.scalers = _load_pickle(scalers_path)
+                self.encoders = _load_pickle(encoders_path)
+                
+                # Load feature names
+                with open(feature_names_path, 'r') as f:
+                    self.feature_names = json.load(f)
+                
+                _MODEL_CACHE[cache_key] = (dict(self.models), self.scalers, self.encoders, list(self.feature_names))
             
-            # Load feature names
-            with open(models_dir / 'enhanced_feature_names.json', 'r') as f:
-                self.feature_names = json.load(f)
+            # Resolve the scaling step once instead of probing it per prediction;
+            # None when there is nothing to apply
+            scaler = self.scalers.get('feature_scaler')
+            if getattr(scaler, '_is_noop', False) or not hasattr(scaler, 'transform'):
+                self._apply_scaler = None
+            elif getattr(scaler, 'n_features_in_', len(self.feature_names)) != len(self.feature_names):
+                # Rows are filled in feature_names order; a scaler fitted on any
+                # other layout would fail every prediction, so refuse it here
+                raise ValueError(
+                    f"Feature scaler expects {scaler.n_features_in_} features, "
+                    f"model uses {len(self.feature_names)}"
+                )
+            else:
+                self._apply_scaler = scaler.transform
+
+            self._init_feature_buffer()
             
             print(f"✅ Loaded {len(self.models)} models with {len(self.feature_names)} features")
             
@@ -241,20 +432,8 @@ class F1SimulationEngine:
     
     def _load_track_data(self):
         try:
-            tracks_df = pd.read_parquet(self.config.get_tracks_path())
-            self.tracks_data = {
-                row['track_id']: {
-                    'name': row['track_name'],
-                    'country': row['country'],
-                    'length_km': row['track_length_km'],
-                    'overtaking_difficulty': row['overtaking_difficulty'],
-                    'weather_sensitivity': row['weather_sensitivity'],
-                    'driver_skill_importance': row['driver_skill_importance'],
-                    'car_performance_importance': row['car_performance_importance'],
-                    'safety_car_probability': row['safety_car_probability']
-                }
-                for _, row in tracks_df.iterrows()
-            }
+            tracks_df = _read_parquet(self.config.get_tracks_path(), _TRACK_COLUMNS)
+            self.tracks_data = _build_lookup(tracks_df, 'track_id', _TRACK_FIELDS)
             print(f"✅ Loaded {len(self.tracks_data)} tracks")
         except Exception as e:
             logger.error(f"Error loading track data: {e}")
@@ -262,110 +441,143 @@ class F1SimulationEngine:
 
     def _load_car_data(self):
         try:
-            cars_df = pd.read_parquet(self.config.get_cars_path())
-            self.cars_data = {
-                row['constructor_id']: {
-                    'name': row['constructor_name'],
-                    'overall_performance': row['overall_performance'],
-                    'speed_rating': row['speed_rating'],
-                    'cornering_rating': row['cornering_rating'],
-                    'reliability_rating': row['reliability_rating']
-                }
-                for _, row in cars_df.iterrows()
-            }
+            cars_df = _read_parquet(self.config.get_cars_path(), _CAR_COLUMNS)
+            self.cars_data = _build_lookup(cars_df, 'constructor_id', _CAR_FIELDS)
             print(f"✅ Loaded {len(self.cars_data)} cars")
         except Exception as e:
             logger.error(f"Error loading car data: {e}")
             self.cars_data = {}
 
-    def _load_drivers_database(self):
-        """Load drivers from all relevant files in both enhanced and ml_ready folders."""
-
-        # Load drivers from enhanced
-        enhanced_driver_path = Path(self.config.DATA_DIR) / 'enhanced' / 'enhanced_drivers.parquet'
-        ml_ready_driver_path = Path(self.config.DATA_DIR) / 'ml_ready' / 'full_enhanced_dataset.parquet'
-
+    def _index_lookups(self):
+        """Track and car lookups restricted to the lowercase ids that
+        get_track_info/get_car_info can reach, so exact ids skip .lower(),
+        plus the track and constructor name listings"""
+        self._tracks_lc = {k: v for k, v in self.tracks_data.items() if isinstance(k, str) and k == k.lower()}
+        self._cars_lc = {k: v for k, v in self.cars_data.items() if isinstance(k, str) and k == k.lower()}
+        self._track_names = tuple(info['name'] for info in self.tracks_data.values())
+        self._constructor_names = tuple(info['name'] for info in self.cars_data.values())
+    
+    def _index_cars(self):
+        """Car performance and reliability as arrays for whole-grid evaluation;
+        the trailing row holds the defaults for unknown constructors"""
+        self._car_idx = {constructor_id: i for i, constructor_id in enumerate(self.cars_data)}
+        self._car_perf_arr = np.array([info['overall_performance'] for info in self.cars_data.values()] + [70.0])
+        self._car_reliability_arr = np.array([info['reliability_rating'] / 100 for info in self.cars_data.values()] + [0.8])
+    
+    @functools.cached_property
+    def _driver_season_frames(self) -> List[pd.DataFrame]:
+        """Normalized seasons of every drivers file found, enhanced first, then ml_ready"""
+        return [
+            _driver_seasons_version(str(driver_path), driver_path.stat().st_mtime_ns)
+            for driver_path in (self._enhanced_drivers_parquet, self._drivers_parquet)
+            if driver_path.exists()
+        ]
+    
+    @functools.cached_property
+    def drivers_database(self) -> Dict:
+        """Drivers from both enhanced and ml_ready folders, loaded on first use."""
         drivers_database = {}
-
-        # Try loading from enhanced first (if exists)
-        if enhanced_driver_path.exists():
-            enhanced_df = pd.read_parquet(enhanced_driver_path)
-            for _, row in enhanced_df.iterrows():
-                name = row.get('driver_name') or row.get('name') or row.get('driver_id')
-                if name:
-                    if name not in drivers_database:
-                        drivers_database[name] = {}
-                    # Use available fields
-                    drivers_database[name][row.get('season', 0)] = {
-                        'skill_rating': row.get('skill_rating', 50),
-                        'constructor_id': row.get('constructor_id', row.get('team', '')),
-                        'championship_position': row.get('championship_position', 20),
-                        'points': row.get('points', 0),
-                        'wins': row.get('wins', 0)
-                    }
-
-        # Try loading from ml_ready (if exists)
-        if ml_ready_driver_path.exists():
-            ready_df = pd.read_parquet(ml_ready_driver_path)
-            for _, row in ready_df.iterrows():
-                name = row.get('driver_name') or row.get('name') or row.get('driver_id')
-                if name:
-                    if name not in drivers_database:
-                        drivers_database[name] = {}
-                    drivers_database[name][row.get('season', 0)] = {
-                        'skill_rating': row.get('skill_rating', 50),
-                        'constructor_id': row.get('constructor_id', row.get('team', '')),
-                        'championship_position': row.get('championship_position', 20),
-                        'points': row.get('points', 0),
-                        'wins': row.get('wins', 0)
-                    }
-
-        self.drivers_database = drivers_database
-        print(f"✅ Loaded database with {len(self.drivers_database)} drivers from both enhanced and ml_ready.")
+        for seasons in self._driver_season_frames:
+            _add_driver_seasons(drivers_database, seasons)
+        print(f"✅ Loaded database with {len(drivers_database)} drivers from both enhanced and ml_ready.")
+        return drivers_database
+    
+    @functools.cached_property
+    def drivers_df(self) -> pd.DataFrame:
+        """Columnar copy of the driver seasons for bulk queries, one row per
+        (driver_name, season) with each driver's rows contiguous"""
+        if not self._driver_season_frames:
+            return pd.DataFrame()
+        return (
+            pd.concat(self._driver_season_frames, ignore_index=True)
+            .astype({'driver_name': 'category', 'constructor_id': 'category'})
+            .drop_duplicates(['driver_name', 'season'], keep='last')
+            .set_index(['driver_name', 'season'])
+            .sort_index()
+        )
+    
+    @functools.cached_property
+    def _driver_name_idx(self) -> Dict[str, slice]:
+        """Driver name -> slice of that driver's rows in drivers_df"""
+        if self.drivers_df.empty:
+            return {}
+        return {
+            name: slice(int(rows[0]), int(rows[-1]) + 1)
+            for name, rows in self.drivers_df.groupby(level='driver_name', sort=False, observed=True).indices.items()
+        }
+    
+    def _init_feature_buffer(self):
+        """Generate the feature-row filler and preallocate the prediction input buffer"""
+        
+        # The feature list is fixed once loaded, so unroll it into a function
+        # with one literal-key lookup per feature
+        source = "def _fill_features(driver_features, out):\n" + "".join(
+            f"    out[{i}] = driver_features.get({feature!r}, 0.0)\n"
+            for i, feature in enumerate(self.feature_names)
+        ) + "    return out\n"
+        namespace = {}
+        exec(source, namespace)
+        self._fill_features = namespace['_fill_features']
+        
+        # float32 is what sklearn's tree models predict on, so they take the
+        # buffer without converting it
+        self._feat_buf = np.zeros((1, len(self.feature_names)), dtype=np.float32)
     
     def predict_driver_skill(self, driver_features: Dict[str, float], use_ensemble: bool = True) -> Dict[str, float]:
         """Predict driver skill rating using trained models"""
+        return self.predict_driver_skill_batch([driver_features], use_ensemble)[0]
+    
+    def predict_driver_skill_batch(self, features_list: List[Dict[str, float]], use_ensemble: bool = True) -> List[Dict[str, float]]:
+        """Predict skill ratings for several feature sets with a single model call"""
+        
+        if not features_list:
+            return []
         
         try:
-            # Create feature vector
-            feature_vector = []
-            for feature in self.feature_names:
-                value = driver_features.get(feature, 0.0)
-                feature_vector.append(float(value))
+            # Fill the first N rows of the reusable (N, F) feature buffer, growing
+            # it for larger batches; scaler and model both take it as is
+            if len(features_list) > len(self._feat_buf):
+                self._feat_buf = np.zeros((len(features_list), len(self.feature_names)), dtype=np.float32)
+            features = self._feat_buf[:len(features_list)]
             
-            # Convert to DataFrame
-            features_df = pd.DataFrame([feature_vector], columns=self.feature_names)
+            fill_features = self._fill_features
+            for row, driver_features in zip(features, features_list):
+                fill_features(driver_features, row)
             
             # Apply scaling
-            if hasattr(self.scalers.get('feature_scaler'), 'transform'):
-                try:
-                    scaled_features = self.scalers['feature_scaler'].transform(features_df)
-                    scaled_df = pd.DataFrame(scaled_features, columns=self.feature_names)
-                except:
-                    scaled_df = features_df
-            else:
-                scaled_df = features_df
+            if self._apply_scaler is not None:
+                features = self._apply_scaler(features)
             
             # Make prediction using your trained model
             model_key = 'ensemble' if use_ensemble and 'ensemble' in self.models else 'primary'
             model = self.models[model_key]
             
-            prediction = model.predict(scaled_df.values)[0]
+            # Models fitted on DataFrames warn about the bare ndarray every call
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", message="X does not have valid feature names")
+                predictions = model.predict(features)
             
-            return {
-                'skill_rating': float(np.clip(prediction, 25, 100)),
-                'confidence': 0.99,  # Your models have 99.9% accuracy!
-                'model_used': model_key,
-                'features_used': len(self.feature_names)
-            }
+            # Clip the whole prediction array at once before unpacking it
+            return [
+                {
+                    'skill_rating': prediction,
+                    'confidence': 0.99,  # Your models have 99.9% accuracy!
+                    'model_used': model_key,
+                    'features_used': len(self.feature_names)
+                }
+                for prediction in np.clip(predictions, 25, 100).tolist()
+            ]
             
         except Exception as e:
             logger.error(f"Error in skill prediction: {e}")
-            return {
-                'skill_rating': 65.0,
-                'confidence': 0.5,
-                'error': str(e)
-            }
+            return [
+                {
+                    'skill_rating': 65.0,
+                    'confidence': 0.5,
+                    'error': str(e)
+                }
+                for _ in features_list
+            ]
     
     # All other methods remain the same as in previous version...
     def get_driver_historical_data(self, driver_name: str, year: Optional[int] = None) -> Dict:
@@ -378,47 +590,76 @@ class F1SimulationEngine:
         else:
             return driver_data
     
+    def get_driver_historical_data_bulk(self, driver_names: List[str], year: int) -> Dict[str, Dict]:
+        """Each driver's season for year, or their latest recorded season if that year
+        is missing; drivers without any recorded season are left out"""
+        seasons_by_driver = {}
+        for driver_name in driver_names:
+            driver_data = self.drivers_database.get(self._clean_driver_name(driver_name))
+            if driver_data:
+                seasons_by_driver[driver_name] = driver_data.get(year) or driver_data[max(driver_data)]
+        return seasons_by_driver
+    
+    def get_driver_seasons(self, driver_name: str) -> pd.DataFrame:
+        """All recorded seasons of a driver as a DataFrame indexed by season"""
+        rows = self._driver_name_idx.get(self._clean_driver_name(driver_name))
+        if rows is None:
+            return pd.DataFrame(columns=list(_DRIVER_DEFAULTS))
+        return self.drivers_df.iloc[rows].droplevel('driver_name')
+    
     def get_track_info(self, track_id: str) -> Dict:
-        return self.tracks_data.get(track_id.lower(), {})
+        info = self._tracks_lc.get(track_id)
+        return info if info is not None else self._tracks_lc.get(track_id.lower(), {})
     
     def get_car_info(self, constructor_id: str) -> Dict:
-        return self.cars_data.get(constructor_id.lower(), {})
+        info = self._cars_lc.get(constructor_id)
+        return info if info is not None else self._cars_lc.get(constructor_id.lower(), {})
     
     def list_available_drivers(self) -> List[str]:
         return list(self.drivers_database.keys())
     
-    def list_available_tracks(self) -> List[str]:
-        return [info['name'] for info in self.tracks_data.values()]
+    def list_available_tracks(self) -> Tuple[str, ...]:
+        return self._track_names
     
-    def list_available_constructors(self) -> List[str]:
-        return [info['name'] for info in self.cars_data.values()]
+    def list_available_constructors(self) -> Tuple[str, ...]:
+        return self._constructor_names
     
-    def _clean_driver_name(self, name: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _clean_driver_name(name: str) -> str:
         return name.title().strip()
     
     def calculate_race_performance_factors(self, driver_skill: float, track_id: str, constructor_id: str, weather: str = "dry") -> Dict[str, float]:
+        """Single-driver view of calculate_grid_performance_factors"""
+        factors = self.calculate_grid_performance_factors([driver_skill], track_id, [constructor_id], weather)
+        return {
+            key: float(value[0]) if isinstance(value, np.ndarray) else value
+            for key, value in factors.items()
+        }
+    
+    def calculate_grid_performance_factors(self, driver_skills: List[float], track_id: str, constructor_ids: List[str], weather: str = "dry") -> Dict[str, np.ndarray]:
+        """calculate_race_performance_factors for a whole grid at once, as arrays"""
         track_info = self.get_track_info(track_id)
-        car_info = self.get_car_info(constructor_id)
         
         driver_importance = track_info.get('driver_skill_importance', 70) / 100 if track_info else 0.7
         car_importance = track_info.get('car_performance_importance', 70) / 100 if track_info else 0.7
-        car_performance = car_info.get('overall_performance', 70) if car_info else 70
         
-        track_performance = (driver_skill * driver_importance + car_performance * car_importance)
+        default_row = len(self._car_idx)
+        car_rows = np.array([self._car_idx.get(constructor_id.lower(), default_row) for constructor_id in constructor_ids], dtype=np.intp)
+        driver_skill = np.asarray(driver_skills, dtype=np.float64)
         
-        weather_factor = 1.0
-        if weather == "wet":
-            weather_factor = 0.85 + (driver_skill / 100) * 0.3
-        elif weather == "mixed":
-            weather_factor = 0.92 + (driver_skill / 100) * 0.16
+        track_adjusted, weather_factor, final_performance = race_performance(
+            driver_skill, driver_importance, car_importance,
+            self._car_perf_arr[car_rows], WEATHER_CODES.get(weather, 0)
+        )
         
         return {
             'base_performance': driver_skill,
-            'track_adjusted': track_performance,
+            'track_adjusted': track_adjusted,
             'weather_factor': weather_factor,
-            'final_performance': track_performance * weather_factor,
+            'final_performance': final_performance,
             'overtaking_difficulty': track_info.get('overtaking_difficulty', 50) if track_info else 50,
-            'reliability_factor': car_info.get('reliability_rating', 80) / 100 if car_info else 0.8
+            'reliability_factor': self._car_reliability_arr[car_rows]
         }
     
     def get_system_stats(self) -> Dict[str, Any]:
@@ -436,8 +677,13 @@ class F1SimulationEngine:
 class DummyScaler:
     """Dummy scaler for compatibility"""
     
-    def transform(self, X):
+    # Identity transform; callers may skip scaling entirely when set
+    _is_noop = True
+    
+    @staticmethod
+    def transform(X):
         return X
     
-    def fit_transform(self, X):
+    @staticmethod
+    def fit_transform(X):
         return X
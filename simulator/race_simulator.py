@@ -5,12 +5,31 @@ Simulates complete F1 races using driver skill predictions
 
 import random
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 import logging
 
+from .utils_numba import (DNF, FINISHED, RUNNING, race_kernel, simulate_lap, simulate_race_batch,
+                          update_positions)
+
 logger = logging.getLogger(__name__)
 
+# Failure reported for a DNF, indexed by the driver's failure code
+_FAILURE_TYPES = ('Engine', 'Gearbox', 'Suspension', 'Collision', 'Spin')
+
+# Race state fields run by the batch kernel, in its argument order, and the
+# value that pads a race narrower than the batch
+_BATCH_FIELDS = (
+    ('status', DNF),
+    ('total_time', 0.0),
+    ('laps_completed', 0),
+    ('fastest_lap_time', np.inf),
+    ('pit_stops', 0),
+    ('position', 0),
+    ('performance', 0.0),
+    ('reliability', 0.0)
+)
+
 @dataclass
 class RaceResult:
     """Race result data structure"""
@@ -21,7 +40,20 @@ class RaceResult:
     laps_completed: int
     status: str
     fastest_lap: Optional[str] = None
+    fastest_lap_seconds: Optional[float] = None
     
+# Race classification, one record per classified driver in finishing order;
+# fastest_lap is +inf for a driver who never completed a lap
+RACE_RESULT_DTYPE = np.dtype([
+    ('position', 'i4'),
+    ('driver', 'U64'),
+    ('constructor', 'U32'),
+    ('total_time', 'f8'),
+    ('laps_completed', 'i4'),
+    ('status', 'U16'),
+    ('fastest_lap', 'f8')
+])
+
 @dataclass 
 class RaceSession:
     """Race session configuration"""
@@ -32,71 +64,199 @@ class RaceSession:
     total_laps: int
     grid: List[Dict[str, str]]
 
+@dataclass
+class RaceStateArrays:
+    """Race state of every driver on the grid, one aligned array per field"""
+    driver: np.ndarray
+    constructor: np.ndarray
+    position: np.ndarray
+    laps_completed: np.ndarray
+    total_time: np.ndarray
+    performance: np.ndarray
+    reliability: np.ndarray
+    status: np.ndarray
+    failure: np.ndarray
+    fastest_lap_time: np.ndarray
+    pit_stops: np.ndarray
+    
+    @classmethod
+    def from_grid(cls, grid: List[Dict], performance_factors: Dict[str, np.ndarray]) -> 'RaceStateArrays':
+        """Starting state for a qualifying-ordered grid"""
+        n = len(grid)
+        position = np.array([entry['grid_position'] for entry in grid], dtype=np.int32)
+        # The lap kernels' traffic term relies on positions counting from 1
+        if (position < 1).any():
+            raise ValueError("Grid positions must start at 1")
+        return cls(
+            driver=np.array([entry['driver'] for entry in grid], dtype=object),
+            constructor=np.array([entry['constructor'] for entry in grid], dtype=object),
+            position=position,
+            laps_completed=np.zeros(n, dtype=np.int32),
+            total_time=np.zeros(n),
+            performance=np.asarray(performance_factors['final_performance'], dtype=np.float64),
+            reliability=np.asarray(performance_factors['reliability_factor'], dtype=np.float64),
+            status=np.full(n, RUNNING, dtype=np.int8),
+            failure=np.zeros(n, dtype=np.int8),
+            fastest_lap_time=np.full(n, np.inf),
+            pit_stops=np.zeros(n, dtype=np.int8)
+        )
+
 class RaceSimulator:
     """Advanced F1 race simulator"""
     
     def __init__(self, engine):
         self.engine = engine
         self.random_seed = None
+        # Per-simulator generators, so seeding one simulator never touches global state
+        self._rng = random.Random()
+        self._nprng = np.random.default_rng()
     
     def simulate_race(self, 
                      track_id: str,
                      year: int = 2023,
                      drivers: Optional[List[str]] = None,
                      weather: str = "dry",
-                     laps: int = 50) -> Dict:
-        """Simulate a complete F1 race"""
+                     laps: int = 50,
+                     progress: Optional[Callable[..., None]] = None) -> Dict:
+        """Simulate a complete F1 race
+        
+        progress, if given, is called as progress("grid"), progress("qualifying")
+        and progress("lap", lap, total_laps) as the simulation advances.
+        """
         
         try:
             # Set random seed for reproducible results
-            if self.random_seed:
-                random.seed(self.random_seed)
-                np.random.seed(self.random_seed)
-            
-            # Get track information
-            track_info = self.engine.get_track_info(track_id)
-            if not track_info:
-                return {"error": f"Track '{track_id}' not found"}
+            self._set_seed(self.random_seed)
             
-            # Setup race grid
-            race_grid = self._setup_race_grid(drivers, year)
-            if not race_grid:
-                return {"error": "Could not setup race grid"}
-            
-            # Create race session
-            session = RaceSession(
-                track_id=track_id,
-                track_name=track_info['name'],
-                year=year,
-                weather=weather,
-                total_laps=laps,
-                grid=race_grid
-            )
+            session = self._setup_session(track_id, year, drivers, weather, laps, progress)
+            if isinstance(session, dict):
+                return session
             
             # Run qualifying simulation
+            if progress:
+                progress("qualifying")
             qualifying_results = self._simulate_qualifying(session)
             
             # Run race simulation
-            race_results = self._simulate_race_main(session, qualifying_results)
+            race_results = self._simulate_race_main(session, qualifying_results, progress)
             
-            # Calculate race statistics
-            race_stats = self._calculate_race_statistics(session, race_results)
-            
-            return {
-                'track': track_info['name'],
-                'year': year,
-                'weather': weather,
-                'laps': laps,
-                'qualifying': qualifying_results,
-                'results': race_results,
-                'statistics': race_stats,
-                'success': True
-            }
+            return self._race_report(session, qualifying_results, race_results)
             
         except Exception as e:
             logger.error(f"Race simulation error: {e}")
             return {"error": str(e), "success": False}
     
+    def simulate_races(self, configs: List[Dict]) -> List[Dict]:
+        """Simulate a batch of independent races, running their laps in parallel
+        
+        Each config gives simulate_race's arguments by name (track_id, and optionally
+        year, drivers, weather and laps) plus an optional seed, which defaults to
+        random_seed. Returns one simulate_race result per config, in order.
+        """
+        
+        reports: List[Optional[Dict]] = [None] * len(configs)
+        races = []
+        
+        # Grids and qualifying are cheap; set each race up in turn
+        for k, config in enumerate(configs):
+            try:
+                seed = config.get('seed', self.random_seed)
+                self._set_seed(seed)
+                session = self._setup_session(config['track_id'], config.get('year', 2023),
+                                              config.get('drivers'), config.get('weather', 'dry'),
+                                              config.get('laps', 50))
+                if isinstance(session, dict):
+                    reports[k] = session
+                    continue
+                qualifying_results = self._simulate_qualifying(session)
+                race_state, draws = self._start_race(session, qualifying_results)
+                races.append((k, session, qualifying_results, race_state, draws))
+            except Exception as e:
+                logger.error(f"Race simulation error: {e}")
+                reports[k] = {"error": str(e), "success": False}
+        
+        if races:
+            # Pad every race to the widest grid and longest race; padded drivers
+            # start retired and padded laps are never run
+            width = max(race[3].status.size for race in races)
+            state = []
+            for field, fill in _BATCH_FIELDS:
+                column = np.full((len(races), width), fill, dtype=getattr(races[0][3], field).dtype)
+                for r, race in enumerate(races):
+                    values = getattr(race[3], field)
+                    column[r, :values.size] = values
+                state.append(column)
+            
+            total_laps = np.array([race[1].total_laps for race in races], dtype=np.int64)
+            max_laps = int(total_laps.max())
+            draws = []
+            for d, sample in enumerate(races[0][4]):
+                shape = (len(races), max_laps) + ((width,) if sample.ndim == 2 else ())
+                column = np.zeros(shape, dtype=sample.dtype)
+                for r, race in enumerate(races):
+                    values = race[4][d]
+                    column[(r,) + tuple(slice(0, size) for size in values.shape)] = values
+                draws.append(column)
+            
+            simulate_race_batch(total_laps, *state, *draws)
+            
+            for r, (k, session, qualifying_results, race_state, _) in enumerate(races):
+                n = race_state.status.size
+                for (field, _), column in zip(_BATCH_FIELDS, state):
+                    setattr(race_state, field, column[r, :n])
+                reports[k] = self._race_report(session, qualifying_results, self._race_results(race_state))
+        
+        return reports
+    
+    def _set_seed(self, seed: Optional[int]):
+        """Reseed this simulator's generators; a falsy seed leaves them running"""
+        if seed:
+            self._rng.seed(seed)
+            self._nprng = np.random.default_rng(seed)
+    
+    def _setup_session(self, track_id: str, year: int, drivers: Optional[List[str]], weather: str,
+                       laps: int, progress: Optional[Callable[..., None]] = None) -> Union[RaceSession, Dict]:
+        """Build the race session, or return an error dict if the track or grid is unavailable"""
+        
+        # Get track information
+        track_info = self.engine.get_track_info(track_id)
+        if not track_info:
+            return {"error": f"Track '{track_id}' not found"}
+        
+        # Setup race grid
+        if progress:
+            progress("grid")
+        race_grid = self._setup_race_grid(drivers, year)
+        if not race_grid:
+            return {"error": "Could not setup race grid"}
+        
+        return RaceSession(
+            track_id=track_id,
+            track_name=track_info['name'],
+            year=year,
+            weather=weather,
+            total_laps=laps,
+            grid=race_grid
+        )
+    
+    def _race_report(self, session: RaceSession, qualifying_results: List[Dict],
+                     race_results: np.ndarray) -> Dict:
+        """Assemble the simulate_race result for a finished race"""
+        
+        # Calculate race statistics
+        race_stats = self._calculate_race_statistics(session, race_results)
+        
+        return {
+            'track': session.track_name,
+            'year': session.year,
+            'weather': session.weather,
+            'laps': session.total_laps,
+            'qualifying': qualifying_results,
+            'results': self.to_race_results(race_results),
+            'statistics': race_stats,
+            'success': True
+        }
+    
     def _setup_race_grid(self, drivers: Optional[List[str]], year: int) -> List[Dict]:
         """Setup the race grid with drivers and constructors"""
         
@@ -107,27 +267,24 @@ class RaceSimulator:
             # Use top drivers from the database
             drivers = available_drivers[:20]  # Top 20 drivers
         
+        drivers = drivers[:20]  # Max 20 drivers
+        
+        # Get every driver's historical data, falling back to their latest available year
+        grid_data = self.engine.get_driver_historical_data_bulk(drivers, year)
+        
         race_grid = []
         
-        for i, driver in enumerate(drivers[:20]):  # Max 20 drivers
+        for i, driver in enumerate(drivers):
             # Get constructor (cycle through available ones)
             constructor = available_constructors[i % len(available_constructors)]
             
-            # Get driver historical data
-            driver_data = self.engine.get_driver_historical_data(driver, year)
-            
-            if not driver_data:
-                # Use latest available year
-                all_driver_data = self.engine.get_driver_historical_data(driver)
-                if all_driver_data:
-                    latest_year = max(all_driver_data.keys())
-                    driver_data = all_driver_data[latest_year]
-                else:
-                    # Default data
-                    driver_data = {
-                        'skill_rating': 60 + random.randint(-10, 10),
-                        'constructor_id': constructor
-                    }
+            driver_data = grid_data.get(driver)
+            if driver_data is None:
+                # Default data
+                driver_data = {
+                    'skill_rating': 60 + self._rng.randint(-10, 10),
+                    'constructor_id': constructor
+                }
             
             race_grid.append({
                 'driver': driver,
@@ -140,190 +297,213 @@ class RaceSimulator:
     
     def _simulate_qualifying(self, session: RaceSession) -> List[Dict]:
         """Simulate qualifying session"""
+
+        grid = session.grid
+        n = len(grid)
+        skills = np.array([entry['skill_rating'] for entry in grid], dtype=np.float64)
         
-        qualifying_results = []
-        
-        for entry in session.grid:
-            # Calculate qualifying performance
-            driver_skill = entry['skill_rating']
-            car_info = self.engine.get_car_info(entry['constructor'])
-            track_info = self.engine.get_track_info(session.track_id)
-            
-            # Base qualifying time (in seconds, relative to track)
-            base_time = 80 + random.uniform(-5, 5)  # Base lap time ~80s
-            
-            # Performance adjustments
-            skill_factor = (100 - driver_skill) / 100 * 3  # Better skill = faster time
-            car_factor = (100 - car_info.get('speed_rating', 70)) / 100 * 2
-            
-            # Weather impact
-            weather_impact = 0
-            if session.weather == "wet":
-                weather_impact = random.uniform(0, 3) - (driver_skill / 100) * 2
-            
-            # Calculate final qualifying time
-            qualifying_time = base_time + skill_factor + car_factor + weather_impact + random.uniform(-0.5, 0.5)
-            
-            qualifying_results.append({
+        # One car lookup per constructor on the grid
+        speed_ratings = {constructor: self.engine.get_car_info(constructor).get('speed_rating', 70)
+                         for constructor in {entry['constructor'] for entry in grid}}
+        speeds = np.array([speed_ratings[entry['constructor']] for entry in grid], dtype=np.float64)
+
+        # Base qualifying time (in seconds, relative to track), ~80s
+        base_time = 80 + self._nprng.uniform(-5, 5, n)
+
+        # Performance adjustments - better skill and car = faster time
+        skill_factor = (100 - skills) / 100 * 3
+        car_factor = (100 - speeds) / 100 * 2
+
+        # Weather impact
+        weather_impact = 0
+        if session.weather == "wet":
+            weather_impact = self._nprng.uniform(0, 3, n) - (skills / 100) * 2
+
+        # Calculate final qualifying times
+        times = base_time + skill_factor + car_factor + weather_impact + self._nprng.uniform(-0.5, 0.5, n)
+
+        # Grid order by qualifying time; results are built straight in that order,
+        # so grid positions come from the enumeration rather than a second pass
+        order = np.argsort(times, kind='stable')
+        times = times[order]
+        entries = [grid[i] for i in order.tolist()]
+
+        return [
+            {
                 'driver': entry['driver'],
                 'constructor': entry['constructor'],
                 'time': qualifying_time,
-                'time_formatted': self._format_lap_time(qualifying_time),
-                'skill_rating': driver_skill
-            })
+                'time_formatted': time_formatted,
+                'skill_rating': entry['skill_rating'],
+                'grid_position': position
+            }
+            for position, (entry, qualifying_time, time_formatted)
+            in enumerate(zip(entries, times.tolist(), self._format_lap_times(times)), 1)
+        ]
+    
+    def _simulate_race_main(self, session: RaceSession, grid: List[Dict],
+                            progress: Optional[Callable[..., None]] = None) -> np.ndarray:
+        """Simulate the main race, returning its classification as a RACE_RESULT_DTYPE array"""
+        
+        race_state, (weather_mod, rel_roll, base_jitter, noise) = \
+            self._start_race(session, grid)
         
-        # Sort by qualifying time
-        qualifying_results.sort(key=lambda x: x['time'])
+        laps = session.total_laps
+        if not progress:
+            # Nothing to report between laps: run the whole race in one kernel call
+            race_kernel(laps)(race_state.status, race_state.total_time, race_state.laps_completed,
+                              race_state.fastest_lap_time, race_state.pit_stops, race_state.position,
+                              race_state.performance, race_state.reliability,
+                              weather_mod, rel_roll, base_jitter, noise)
+            return self._race_results(race_state)
         
-        # Add grid positions
-        for i, result in enumerate(qualifying_results):
-            result['grid_position'] = i + 1
+        # Simulate each lap
+        for lap, lap_weather in enumerate(weather_mod.tolist(), 1):
+            progress("lap", lap, laps)
+            row = lap - 1
+            self._simulate_lap(race_state, lap, laps, lap_weather,
+                               (rel_roll[row], base_jitter[row], noise[row]))
         
-        return qualifying_results
+        return self._race_results(race_state)
     
-    def _simulate_race_main(self, session: RaceSession, grid: List[Dict]) -> List[RaceResult]:
-        """Simulate the main race"""
-        
-        track_info = self.engine.get_track_info(session.track_id)
-        
-        # Initialize race state
-        race_state = []
-        for entry in grid:
-            performance_factors = self.engine.calculate_race_performance_factors(
-                entry['skill_rating'],
-                session.track_id,
-                entry['constructor'],
-                session.weather
-            )
-            
-            race_state.append({
-                'driver': entry['driver'],
-                'constructor': entry['constructor'],
-                'position': entry['grid_position'],
-                'laps_completed': 0,
-                'total_time': 0,
-                'performance': performance_factors['final_performance'],
-                'reliability': performance_factors['reliability_factor'],
-                'status': 'running',
-                'fastest_lap_time': None,
-                'pit_stops': 0
-            })
+    def _start_race(self, session: RaceSession,
+                    grid: List[Dict]) -> Tuple[RaceStateArrays, Tuple[np.ndarray, ...]]:
+        """Starting race state and every random draw of the race
         
-        # Simulate each lap
-        for lap in range(1, session.total_laps + 1):
-            self._simulate_lap(race_state, lap, track_info, session)
+        The draws are (weather_mod, rel_roll, base_jitter, noise), with one row per
+        lap. Each driver's failure code, used if they retire, is drawn into the state.
+        """
+        
+        # Initialize race state, evaluating the whole grid at once
+        performance_factors = self.engine.calculate_grid_performance_factors(
+            [entry['skill_rating'] for entry in grid],
+            session.track_id,
+            [entry['constructor'] for entry in grid],
+            session.weather
+        )
+        race_state = RaceStateArrays.from_grid(grid, performance_factors)
+        
+        # Draw every random number of the race up front, one row per lap
+        rng = self._nprng
+        laps = session.total_laps
+        shape = (laps, race_state.status.size)
+        rel_roll = rng.random(shape)
+        base_jitter = rng.uniform(-2, 2, shape)
+        
+        # Weather slows the whole field by the same amount each lap
+        if session.weather == "wet":
+            weather_mod = rng.uniform(2, 8, laps)
+        elif session.weather == "mixed":
+            weather_mod = rng.uniform(1, 4, laps)
+        else:
+            weather_mod = np.zeros(laps)
+        
+        noise = rng.uniform(-0.5, 0.5, shape)
+        
+        # A driver retires at most once, so one failure code each covers the race
+        race_state.failure = rng.integers(0, len(_FAILURE_TYPES), race_state.status.size, dtype=np.int8)
+        
+        return race_state, (weather_mod, rel_roll, base_jitter, noise)
+    
+    def _race_results(self, race_state: RaceStateArrays) -> np.ndarray:
+        """Classify a finished race as a RACE_RESULT_DTYPE array in finishing order"""
         
-        # Convert to race results
-        race_results = []
-        running_drivers = [d for d in race_state if d['status'] == 'finished' or d['laps_completed'] > 0]
+        classified = np.flatnonzero((race_state.status == FINISHED) | (race_state.laps_completed > 0))
         
         # Sort by laps completed (desc) then by total time
-        running_drivers.sort(key=lambda x: (-x['laps_completed'], x['total_time']))
-        
-        for i, driver_state in enumerate(running_drivers):
-            race_results.append(RaceResult(
-                position=i + 1,
-                driver=driver_state['driver'],
-                constructor=driver_state['constructor'],
-                time=self._format_race_time(driver_state['total_time']) if i == 0 else f"+{self._format_gap_time(driver_state['total_time'] - running_drivers[0]['total_time'])}",
-                laps_completed=driver_state['laps_completed'],
-                status='Finished' if driver_state['status'] == 'finished' else driver_state['status'].title(),
-                fastest_lap=self._format_lap_time(driver_state['fastest_lap_time']) if driver_state['fastest_lap_time'] else None
-            ))
-        
-        return race_results
+        order = classified[np.lexsort((race_state.total_time[classified],
+                                       -race_state.laps_completed[classified]))]
+        
+        results = np.empty(order.size, dtype=RACE_RESULT_DTYPE)
+        results['position'] = np.arange(1, order.size + 1)
+        results['driver'] = race_state.driver[order]
+        results['constructor'] = race_state.constructor[order]
+        results['total_time'] = race_state.total_time[order]
+        results['laps_completed'] = race_state.laps_completed[order]
+        # Failure names are only looked up here, from the retired drivers' codes
+        results['status'] = np.where(race_state.status[order] == FINISHED, 'Finished',
+                                     np.array(_FAILURE_TYPES)[race_state.failure[order]])
+        results['fastest_lap'] = race_state.fastest_lap_time[order]
+        return results
     
-    def _simulate_lap(self, race_state: List[Dict], lap: int, track_info: Dict, session: RaceSession):
-        """Simulate a single lap for all drivers"""
+    def to_race_results(self, results: np.ndarray) -> List[RaceResult]:
+        """Box a RACE_RESULT_DTYPE array into RaceResult objects"""
         
-        for driver_state in race_state:
-            if driver_state['status'] != 'running':
-                continue
-            
-            # Reliability check
-            reliability_factor = driver_state['reliability']
-            if random.random() > reliability_factor and lap > 5:
-                # DNF
-                failure_types = ['Engine', 'Gearbox', 'Suspension', 'Collision', 'Spin']
-                driver_state['status'] = random.choice(failure_types)
-                continue
-            
-            # Calculate lap time
-            base_lap_time = 85 + random.uniform(-2, 2)  # Base lap time
-            performance_modifier = (100 - driver_state['performance']) / 100 * 3
-            
-            # Weather effect
-            weather_modifier = 0
-            if session.weather == "wet":
-                weather_modifier = random.uniform(2, 8)
-            elif session.weather == "mixed":
-                weather_modifier = random.uniform(1, 4)
-            
-            # Tyre degradation (simplified)
-            tyre_deg = (lap / session.total_laps) * 0.5
-            
-            # Traffic effect (based on position)
-            traffic_effect = max(0, (driver_state['position'] - 1) * 0.1)
-            
-            # Calculate final lap time
-            lap_time = base_lap_time + performance_modifier + weather_modifier + tyre_deg + traffic_effect + random.uniform(-0.5, 0.5)
-            
-            # Update driver state
-            driver_state['total_time'] += lap_time
-            driver_state['laps_completed'] += 1
-            
-            # Track fastest lap
-            if driver_state['fastest_lap_time'] is None or lap_time < driver_state['fastest_lap_time']:
-                driver_state['fastest_lap_time'] = lap_time
-            
-            # Pit stop logic (simplified)
-            if lap in [15, 35] and driver_state['pit_stops'] < 2:  # Mandatory pit stops
-                driver_state['total_time'] += 25  # Pit stop time
-                driver_state['pit_stops'] += 1
+        if not results.size:
+            return []
         
-        # Update positions based on total time
-        running_drivers = [d for d in race_state if d['status'] == 'running']
-        running_drivers.sort(key=lambda x: x['total_time'])
+        # Format each time column in one pass: the winner's race time, everyone
+        # else's gap to the winner, and fastest laps
+        total_time = results['total_time']
+        times = ['+' + gap for gap in self._format_gap_times(total_time - total_time[0])]
+        times[0] = self._format_race_time(total_time[0].item())
+        fastest_lap_time = results['fastest_lap']
+        has_fastest_lap = np.isfinite(fastest_lap_time)
+        fastest_laps = self._format_lap_times(np.where(has_fastest_lap, fastest_lap_time, 0.0))
+        
+        return [
+            RaceResult(
+                position=position,
+                driver=driver,
+                constructor=constructor,
+                time=time,
+                laps_completed=laps_completed,
+                status=status,
+                fastest_lap=fastest_lap if has_fastest else None,
+                fastest_lap_seconds=fastest_lap_seconds if has_fastest else None
+            )
+            for position, driver, constructor, time, laps_completed, status, fastest_lap, fastest_lap_seconds, has_fastest
+            in zip(results['position'].tolist(), results['driver'].tolist(), results['constructor'].tolist(),
+                   times, results['laps_completed'].tolist(), results['status'].tolist(), fastest_laps,
+                   fastest_lap_time.tolist(), has_fastest_lap.tolist())
+        ]
+    
+    def _simulate_lap(self, race_state: RaceStateArrays, lap: int, total_laps: int,
+                      weather_mod: float, draws: Tuple[np.ndarray, ...]):
+        """Simulate a single lap for all drivers from this lap's pre-drawn random numbers"""
+        
+        status = race_state.status
+        simulate_lap(status, race_state.total_time, race_state.laps_completed,
+                     race_state.fastest_lap_time, race_state.pit_stops, race_state.position,
+                     race_state.performance, race_state.reliability, lap, total_laps,
+                     weather_mod, *draws)
         
-        for i, driver_state in enumerate(running_drivers):
-            driver_state['position'] = i + 1
+        # Update positions based on total time
+        update_positions(status, race_state.total_time, race_state.position)
         
         # Mark completed race
-        if lap == session.total_laps:
-            for driver_state in race_state:
-                if driver_state['status'] == 'running':
-                    driver_state['status'] = 'finished'
+        if lap == total_laps:
+            status[status == RUNNING] = FINISHED
     
-    def _calculate_race_statistics(self, session: RaceSession, results: List[RaceResult]) -> Dict:
-        """Calculate race statistics"""
+    def _calculate_race_statistics(self, session: RaceSession, results: np.ndarray) -> Dict:
+        """Calculate race statistics from a RACE_RESULT_DTYPE array"""
         
-        if not results:
+        if not results.size:
             return {}
         
-        # Find fastest lap
+        # Find fastest lap; drivers without a lap are at +inf
         fastest_lap_driver = None
         fastest_lap_time = None
         
-        for result in results:
-            if result.fastest_lap:
-                lap_time = self._parse_lap_time(result.fastest_lap)
-                if fastest_lap_time is None or lap_time < fastest_lap_time:
-                    fastest_lap_time = lap_time
-                    fastest_lap_driver = result.driver
+        fastest = int(np.argmin(results['fastest_lap']))
+        if np.isfinite(results['fastest_lap'][fastest]):
+            fastest_lap_driver = results['driver'][fastest].item()
+            fastest_lap_time = self._format_lap_time(results['fastest_lap'][fastest].item())
         
         # Calculate other statistics
-        finishers = len([r for r in results if r.status == 'Finished'])
-        dnfs = len(results) - finishers
+        finishers = int(np.count_nonzero(results['status'] == 'Finished'))
+        dnfs = results.size - finishers
+        winner = results['driver'][0].item()
         
         return {
-            'pole_sitter': results[0].driver if results else None,
-            'winner': results[0].driver if results else None,
+            'pole_sitter': winner,
+            'winner': winner,
             'fastest_lap_driver': fastest_lap_driver,
-            'fastest_lap_time': self._format_lap_time(fastest_lap_time) if fastest_lap_time else None,
+            'fastest_lap_time': fastest_lap_time,
             'finishers': finishers,
             'dnfs': dnfs,
-            'completion_rate': finishers / len(results) if results else 0,
-            'safety_cars': random.randint(0, 2),  # Simplified
+            'completion_rate': finishers / results.size,
+            'safety_cars': self._rng.randint(0, 2),  # Simplified
             'total_laps': session.total_laps
         }
     
@@ -336,6 +516,11 @@ class RaceSimulator:
         seconds = seconds % 60
         return f"{minutes}:{seconds:06.3f}"
     
+    def _format_lap_times(self, seconds: np.ndarray) -> List[str]:
+        """Format an array of lap times as MM:SS.mmm"""
+        minutes = (seconds // 60).astype(np.int64).tolist()
+        return [f"{m}:{s:06.3f}" for m, s in zip(minutes, np.mod(seconds, 60).tolist())]
+    
     def _format_race_time(self, seconds: float) -> str:
         """Format race time as H:MM:SS.mmm"""
         hours = int(seconds // 3600)
@@ -347,22 +532,9 @@ class RaceSimulator:
         else:
             return f"{minutes}:{seconds:06.3f}"
     
-    def _format_gap_time(self, gap_seconds: float) -> str:
-        """Format gap time"""
-        if gap_seconds < 60:
-            return f"{gap_seconds:.3f}s"
-        else:
-            minutes = int(gap_seconds // 60)
-            seconds = gap_seconds % 60
-            return f"{minutes}:{seconds:06.3f}"
-    
-    def _parse_lap_time(self, time_str: str) -> float:
-        """Parse lap time string to seconds"""
-        try:
-            if ":" in time_str:
-                parts = time_str.split(":")
-                return float(parts[0]) * 60 + float(parts[1])
-            else:
-                return float(time_str.replace("s", ""))
-        except:
-            return 90.0  # Default
+    def _format_gap_times(self, gap_seconds: np.ndarray) -> List[str]:
+        """Format an array of gap times"""
+        minutes = (gap_seconds // 60).astype(np.int64).tolist()
+        seconds = np.mod(gap_seconds, 60).tolist()
+        return [f"{gap:.3f}s" if gap < 60 else f"{m}:{s:06.3f}"
+                for gap, m, s in zip(gap_seconds.tolist(), minutes, seconds)]
@@ -0,0 +1,258 @@
+"""
+Numba kernels for the F1 simulator
+Numba is optional; every kernel has a NumPy fallback with the same results
+"""
+
+import functools
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # Numba is optional - kernels fall back to NumPy
+    NUMBA_AVAILABLE = False
+
+# Default-feature buckets whose values come from the season, not a random draw
+KIND_EXPERIENCE = 1
+KIND_ERA = 2
+
+
+# Feature lists shorter than this fill faster through NumPy than through a
+# kernel whose first call pays the JIT compile
+FILL_DEFAULTS_KERNEL_MIN_FEATURES = 256
+
+
+def _fill_defaults_numpy(kinds, low, high, randoms, experience, era, out):
+    """Fill a default feature vector from per-feature bounds and uniform [0, 1) draws"""
+    np.add(low, (high - low) * randoms, out=out)
+    out[kinds == KIND_EXPERIENCE] = experience
+    out[kinds == KIND_ERA] = era
+    return out
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _fill_defaults_kernel(kinds, low, high, randoms, experience, era, out):
+        """Fill a default feature vector from per-feature bounds and uniform [0, 1) draws"""
+        for i in range(kinds.size):
+            kind = kinds[i]
+            if kind == KIND_EXPERIENCE:
+                out[i] = experience
+            elif kind == KIND_ERA:
+                out[i] = era
+            else:
+                out[i] = low[i] + (high[i] - low[i]) * randoms[i]
+        return out
+
+
+def fill_defaults_for(n_features):
+    """The default-feature filler for a feature list of n_features entries"""
+    if NUMBA_AVAILABLE and n_features >= FILL_DEFAULTS_KERNEL_MIN_FEATURES:
+        return _fill_defaults_kernel
+    return _fill_defaults_numpy
+
+
+# Weather factor is base + skill / 100 * slope, indexed by weather code;
+# any weather without a code races as dry
+WEATHER_CODES = {'dry': 0, 'wet': 1, 'mixed': 2}
+_WEATHER_BASE = np.array([1.0, 0.85, 0.92])
+_WEATHER_SLOPE = np.array([0.0, 0.3, 0.16])
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def race_performance(driver_skill, driver_importance, car_importance, car_performance, weather_code):
+        """Track-adjusted performance, weather factor and final performance for a grid"""
+        n = driver_skill.size
+        track_adjusted = np.empty(n)
+        weather_factor = np.empty(n)
+        final_performance = np.empty(n)
+        base = _WEATHER_BASE[weather_code]
+        slope = _WEATHER_SLOPE[weather_code]
+        for i in range(n):
+            track_adjusted[i] = driver_skill[i] * driver_importance + car_performance[i] * car_importance
+            weather_factor[i] = base + (driver_skill[i] / 100) * slope
+            final_performance[i] = track_adjusted[i] * weather_factor[i]
+        return track_adjusted, weather_factor, final_performance
+else:
+    def race_performance(driver_skill, driver_importance, car_importance, car_performance, weather_code):
+        """Track-adjusted performance, weather factor and final performance for a grid"""
+        track_adjusted = driver_skill * driver_importance + car_performance * car_importance
+        weather_factor = _WEATHER_BASE[weather_code] + (driver_skill / 100) * _WEATHER_SLOPE[weather_code]
+        return track_adjusted, weather_factor, track_adjusted * weather_factor
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def driver_season_fields(champ_pos, year, skill_noise, points_noise, wins_contender, wins_other):
+        """Skill rating, points and wins of generated driver seasons"""
+        n = champ_pos.size
+        skill = np.empty(n)
+        points = np.empty(n, dtype=np.int64)
+        wins = np.empty(n, dtype=np.int64)
+        for i in range(n):
+            # Era bonus: classic before 1990, modern before 2010, then hybrid
+            if year[i] < 1990:
+                era_bonus = 5
+            elif year[i] < 2010:
+                era_bonus = 8
+            else:
+                era_bonus = 10
+            base_skill = max(45.0, 105 - champ_pos[i] * 3.5)
+            skill[i] = min(100.0, base_skill + era_bonus + skill_noise[i])
+            points[i] = max(0, int(400 - champ_pos[i] * 25 + points_noise[i]))
+            if champ_pos[i] <= 3:
+                wins[i] = max(0, 12 - champ_pos[i] + wins_contender[i])
+            else:
+                wins[i] = wins_other[i]
+        return skill, points, wins
+else:
+    def driver_season_fields(champ_pos, year, skill_noise, points_noise, wins_contender, wins_other):
+        """Skill rating, points and wins of generated driver seasons"""
+        era_bonus = np.select([year < 1990, year < 2010], [5, 8], 10)
+        base_skill = np.maximum(45.0, 105 - champ_pos * 3.5)
+        skill = np.minimum(100.0, base_skill + era_bonus + skill_noise)
+        points = np.maximum(0, np.trunc(400 - champ_pos * 25 + points_noise)).astype(np.int64)
+        wins = np.where(champ_pos <= 3, np.maximum(0, 12 - champ_pos + wins_contender), wins_other)
+        return skill, points, wins
+
+
+# Driver status codes of the race state arrays
+RUNNING = 0
+FINISHED = 1
+DNF = 2
+
+# Laps with a mandatory pit stop and the time it costs
+PIT_LAP_1 = 15
+PIT_LAP_2 = 35
+PIT_STOP_TIME = 25.0
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def simulate_lap(status, total_time, laps_completed, fastest_lap, pit_stops,
+                     position, performance, reliability, lap, total_laps, weather_mod,
+                     rel_roll, base_jitter, noise):
+        """Advance every running driver by one lap, updating the race state arrays in place"""
+        n = status.size
+        tyre_deg = (lap / total_laps) * 0.5
+
+        # Traffic only depends on last lap's positions, so every driver's lap time
+        # can be computed up front in a branch-free loop; positions start at 1,
+        # so the traffic term needs no clamp
+        lap_time = np.empty(n)
+        for i in range(n):
+            lap_time[i] = (85 + base_jitter[i] + (100 - performance[i]) / 100 * 3
+                           + weather_mod + tyre_deg
+                           + (position[i] - 1) * 0.1 + noise[i])
+
+        for i in range(n):
+            if status[i] != RUNNING:
+                continue
+
+            # Reliability check
+            if rel_roll[i] > reliability[i] and lap > 5:
+                status[i] = DNF
+                continue
+
+            total_time[i] += lap_time[i]
+            laps_completed[i] += 1
+            fastest_lap[i] = min(fastest_lap[i], lap_time[i])
+
+            if (lap == PIT_LAP_1 or lap == PIT_LAP_2) and pit_stops[i] < 2:
+                total_time[i] += PIT_STOP_TIME
+                pit_stops[i] += 1
+else:
+    def simulate_lap(status, total_time, laps_completed, fastest_lap, pit_stops,
+                     position, performance, reliability, lap, total_laps, weather_mod,
+                     rel_roll, base_jitter, noise):
+        """Advance every running driver by one lap, updating the race state arrays in place"""
+        tyre_deg = (lap / total_laps) * 0.5
+
+        # Reliability check for the whole field at once
+        running = status == RUNNING
+        if lap > 5:
+            dnf = running & (rel_roll > reliability)
+            status[dnf] = DNF
+            running &= ~dnf
+
+        lap_time = (85 + base_jitter + (100 - performance) / 100 * 3
+                    + weather_mod + tyre_deg
+                    + (position - 1) * 0.1 + noise)
+
+        total_time[running] += lap_time[running]
+        laps_completed[running] += 1
+        np.minimum(fastest_lap, lap_time, out=fastest_lap, where=running)
+
+        if lap == PIT_LAP_1 or lap == PIT_LAP_2:
+            pitting = running & (pit_stops < 2)
+            total_time[pitting] += PIT_STOP_TIME
+            pit_stops[pitting] += 1
+
+
+def _update_positions(status, total_time, position):
+    """Rank the running drivers by total time; retired drivers keep their last position"""
+    running = np.flatnonzero(status == RUNNING)
+    order = running[np.argsort(total_time[running])]
+    position[order] = np.arange(1, order.size + 1)
+
+
+def _simulate_race_laps(total_laps, status, total_time, laps_completed, fastest_lap, pit_stops,
+                        position, performance, reliability, weather_mod, rel_roll, base_jitter, noise):
+    """Run every lap of one race from its pre-drawn (lap, driver) random numbers"""
+    for row in range(total_laps):
+        simulate_lap(status, total_time, laps_completed, fastest_lap, pit_stops,
+                     position, performance, reliability, row + 1, total_laps, weather_mod[row],
+                     rel_roll[row], base_jitter[row], noise[row])
+        update_positions(status, total_time, position)
+    if total_laps > 0:
+        status[status == RUNNING] = FINISHED
+
+
+# Ranking and the lap loop are sequential either way, so both paths share one definition
+if NUMBA_AVAILABLE:
+    update_positions = njit(cache=True)(_update_positions)
+    simulate_race_laps = njit(cache=True)(_simulate_race_laps)
+else:
+    update_positions = _update_positions
+    simulate_race_laps = _simulate_race_laps
+
+
+@functools.lru_cache(maxsize=16)
+def race_kernel(total_laps):
+    """simulate_race_laps with the race length bound in
+
+    The lap count is a constant of the returned kernel rather than an argument,
+    so each race length compiles once and is reused for every race of that
+    length. The per-lap work in simulate_lap still takes the lap number and
+    race length at run time.
+    """
+    def run_race(status, total_time, laps_completed, fastest_lap, pit_stops, position,
+                 performance, reliability, weather_mod, rel_roll, base_jitter, noise):
+        simulate_race_laps(total_laps, status, total_time, laps_completed, fastest_lap, pit_stops,
+                           position, performance, reliability, weather_mod, rel_roll, base_jitter, noise)
+
+    if NUMBA_AVAILABLE:
+        return njit(cache=True, boundscheck=False)(run_race)
+    return run_race
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def simulate_race_batch(total_laps, status, total_time, laps_completed, fastest_lap, pit_stops,
+                            position, performance, reliability, weather_mod, rel_roll, base_jitter, noise):
+        """Run a batch of independent races, one row of the (race, ...) arrays each, across cores"""
+        for r in prange(status.shape[0]):
+            simulate_race_laps(total_laps[r], status[r], total_time[r], laps_completed[r],
+                               fastest_lap[r], pit_stops[r], position[r], performance[r], reliability[r],
+                               weather_mod[r], rel_roll[r], base_jitter[r], noise[r])
+else:
+    def simulate_race_batch(total_laps, status, total_time, laps_completed, fastest_lap, pit_stops,
+                            position, performance, reliability, weather_mod, rel_roll, base_jitter, noise):
+        """Run a batch of independent races, one row of the (race, ...) arrays each"""
+        for r in range(status.shape[0]):
+            simulate_race_laps(total_laps[r], status[r], total_time[r], laps_completed[r],
+                               fastest_lap[r], pit_stops[r], position[r], performance[r], reliability[r],
+                               weather_mod[r], rel_roll[r], base_jitter[r], noise[r])